@@ -1,8 +1,10 @@
-import json
+import orjson
 import os
 import uuid
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.prompt import Prompt, Confirm, IntPrompt
 from rich.text import Text
@@ -12,13 +14,39 @@ import sys
 
 DATA_DIR = 'task_data'
 TABS_FILE = os.path.join(DATA_DIR, 'tabs.json')
+HISTORY_LIMIT = 200  # Oldest history entries are dropped past this many
 console = Console()
 
+# Static screens, built once and printed in a single call
+WELCOME_PANEL = Group(
+    " WELCOME TO .... ",
+    """
+██████╗ ██╗   ██╗████████╗ █████╗ ███████╗██╗  ██╗███╗   ███╗ █████╗ ███╗   ██╗ █████╗  ██████╗ ███████╗██████╗ ██╗
+██╔══██╗╚██╗ ██╔╝╚══██╔══╝██╔══██╗██╔════╝██║ ██╔╝████╗ ████║██╔══██╗████╗  ██║██╔══██╗██╔════╝ ██╔════╝██╔══██╗██║
+██████╔╝ ╚████╔╝    ██║   ███████║███████╗█████╔╝ ██╔████╔██║███████║██╔██╗ ██║███████║██║  ███╗█████╗  ██████╔╝██║
+██╔═══╝   ╚██╔╝     ██║   ██╔══██║╚════██║██╔═██╗ ██║╚██╔╝██║██╔══██║██║╚██╗██║██╔══██║██║   ██║██╔══╝  ██╔══██╗╚═╝
+██║        ██║      ██║   ██║  ██║███████║██║  ██╗██║ ╚═╝ ██║██║  ██║██║ ╚████║██║  ██║╚██████╔╝███████╗██║  ██║██╗
+╚═╝        ╚═╝      ╚═╝   ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝     ╚═╝╚═╝  ╚═╝╚═╝  ╚═══╝╚═╝  ╚═╝ ╚═════╝ ╚══════╝╚═╝  ╚═╝╚═╝
+""",
+    "Created by: [bold underline] Esteban Rivera [/bold underline]\n",
+    "[bold underline]Task Manager 2.0[/bold underline]\n",
+)
+TASK_MENU = "\n1. Show Tasks\n2. New Task\n3. Modify Task\n4. Delete Task\n5. View Task Info\n6. Filter Tasks\n7. Back to Tabs \n8. Exit Program"
+TASK_MENU_CHOICES = ["1", "2", "3", "4", "5", "6", "7", "8"]
+
 class Tab:
+    __slots__ = ('name', 'tasks', 'task_counter', '_by_id', '_by_state')
+
     def __init__(self, name, tasks):
         self.name = name
         self.tasks = tasks
         self.task_counter = len(tasks) + 1 if tasks else 1
+        # Lookup indexes, kept in sync by add_task, modify_task and delete_task
+        self._by_id = {}
+        self._by_state = defaultdict(set)
+        for task in tasks:
+            self._by_id[task.id] = task
+            self._by_state[task.state].add(task.id)
 
     def to_dict(self):
         return {
@@ -29,20 +57,30 @@ class Tab:
 
     @classmethod
     def from_dict(cls, data):
+        tasks = data['tasks']
+        # A tab file holds all its tasks; fill the parsed list with Tasks rather than copying it
+        for i, task_data in enumerate(tasks):
+            tasks[i] = Task.from_dict(task_data)
         tab = cls(
             name=data['name'],
-            tasks=[Task.from_dict(task_data) for task_data in data['tasks']]
+            tasks=tasks
         )
         tab.task_counter = data.get('task_counter', len(data['tasks']) + 1)
         return tab
 
+def _state(name, color):
+    # (name, color, rich Text, markup string), built once and shared by every row
+    return (name, color, Text(name, style=color), f"[{color}]{name}[/{color}]")
+
 class Task:
     STATE_MAP = {
-        'u': ('Urgent', 'red'),
-        'p': ('In Pause', 'blue'),
-        'g': ('Started', 'yellow'),
-        'f': ('Finished', 'green')
+        'u': _state('Urgent', 'red'),
+        'p': _state('In Pause', 'blue'),
+        'g': _state('Started', 'yellow'),
+        'f': _state('Finished', 'green')
     }
+    UNKNOWN_STATE = _state('Unknown', 'white')
+    __slots__ = ('id', 'title', 'state', 'comment', 'created_at', 'modified_at', 'history', '_comment_preview')
 
     def __init__(self, id, title, state, comment, created_at, modified_at, history):
         self.id = id
@@ -51,7 +89,15 @@ class Task:
         self.comment = comment
         self.created_at = created_at
         self.modified_at = modified_at
-        self.history = history
+        self.history = history if isinstance(history, deque) else deque(history, maxlen=HISTORY_LIMIT)
+        self._comment_preview = None  # Reset whenever the comment changes
+
+    @property
+    def comment_preview(self):
+        if self._comment_preview is None:
+            comment = self.comment
+            self._comment_preview = (comment[:20] + '...') if len(comment) > 20 else comment
+        return self._comment_preview
 
     def to_dict(self):
         return {
@@ -61,7 +107,7 @@ class Task:
             'comment': self.comment,
             'created_at': self.created_at,
             'modified_at': self.modified_at,
-            'history': self.history
+            'history': list(self.history)
         }
 
     @classmethod
@@ -76,27 +122,61 @@ class Task:
             history=data['history']
         )
 
+def _load_tab(path):
+    with open(path, 'rb') as f:
+        return Tab.from_dict(orjson.loads(f.read()))
+
 def load_tabs():
-    tabs = []
-    if os.path.exists(DATA_DIR):
-        for filename in os.listdir(DATA_DIR):
-            if filename.endswith('.json'):
-                with open(os.path.join(DATA_DIR, filename), 'r') as f:
-                    data = json.load(f)
-                    tabs.append(Tab.from_dict(data))
-    return tabs
-
-def save_tabs(tabs):
+    if not os.path.exists(DATA_DIR):
+        return []
+    with os.scandir(DATA_DIR) as entries:
+        paths = [entry.path for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+    # Overlap the file reads; map keeps the directory order
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        return list(executor.map(_load_tab, paths))
+
+def _tab_file(name):
+    return os.path.join(DATA_DIR, f"{name}.json")
+
+def save_tab(tab):
     os.makedirs(DATA_DIR, exist_ok=True)
-    for tab in tabs:
-        tab_file = os.path.join(DATA_DIR, f"{tab.name}.json")
-        with open(tab_file, 'w') as f:
-            json.dump(tab.to_dict(), f, indent=4)
+    tab_file = _tab_file(tab.name)
+    # Write a temp file and rename it so an interrupted save keeps the old file
+    tmp_file = tab_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(orjson.dumps(tab.to_dict(), option=orjson.OPT_INDENT_2))
+    os.replace(tmp_file, tab_file)
+
+def remove_tab_file(name):
+    tab_file = _tab_file(name)
+    if os.path.exists(tab_file):
+        os.remove(tab_file)
+
+# Tables are built once; each redraw only replaces their rows
+_TABS_TABLE = Table(box=box.ROUNDED, title="Tabs Manager")
+_TABS_TABLE.add_column("Number", style="cyan")
+_TABS_TABLE.add_column("Tab Name", style="magenta")
+
+_TASKS_TABLE = Table(
+    box=box.ROUNDED,
+    show_header=True,
+    header_style="bold cyan"
+)
+_TASKS_TABLE.add_column("ID", style="cyan")
+_TASKS_TABLE.add_column("Title", style="white")
+_TASKS_TABLE.add_column("State", style="")
+_TASKS_TABLE.add_column("Created", style="dim")
+_TASKS_TABLE.add_column("Modified", style="dim")
+_TASKS_TABLE.add_column("Comment", style="yellow")
+
+def _clear_rows(table):
+    table.rows.clear()
+    for column in table.columns:
+        column._cells.clear()
 
 def display_tabs(tabs):
-    table = Table(box=box.ROUNDED, title="Tabs Manager")
-    table.add_column("Number", style="cyan")
-    table.add_column("Tab Name", style="magenta")
+    table = _TABS_TABLE
+    _clear_rows(table)
     
     if not tabs:
         console.print("\n[bold yellow][No tabs. Add new tab.][/bold yellow]\n")
@@ -115,7 +195,7 @@ def create_tab(tabs):
     name = Prompt.ask("Enter tab name")
     new_tab = Tab( name=name, tasks=[])
     tabs.append(new_tab)
-    save_tabs(tabs)
+    save_tab(new_tab)
     console.print(f"[green]Tab '{name}' created successfully![/green]")
 
 def modify_tab(tabs):
@@ -131,13 +211,18 @@ def modify_tab(tabs):
             
             if action == "c":
                 new_name = Prompt.ask("Enter new name")
+                old_name = tab.name
                 tab.name = new_name
-                save_tabs(tabs)
+                save_tab(tab)
+                old_file = _tab_file(old_name)
+                # On case-insensitive filesystems "Work" and "work" are the file just saved
+                if os.path.exists(old_file) and not os.path.samefile(old_file, _tab_file(new_name)):
+                    remove_tab_file(old_name)
                 console.print("[green]Tab name updated![/green]")
             elif action == "d":
                 if Confirm.ask(f"[red]Delete tab '{tab.name}' and all its tasks?[/red]"):
                     del tabs[tab_idx]
-                    save_tabs(tabs)
+                    remove_tab_file(tab.name)
                     console.print("[red]Tab deleted![/red]")
         else:
             console.print("[red]Invalid tab number![/red]")
@@ -152,36 +237,20 @@ def display_tasks(tab, filtered_tasks=None):
         console.print("\n[bold yellow][No tasks. Add new task.][/bold yellow]\n")
         return
     
-    table = Table(
-        title=title,
-        box=box.ROUNDED,
-        show_header=True,
-        header_style="bold cyan"
-    )
-    
-    columns = [
-        ("ID", "cyan"),
-        ("Title", "white"),
-        ("State", ""),
-        ("Created", "dim"),
-        ("Modified", "dim"),
-        ("Comment", "yellow")
-    ]
-    
-    for col, style in columns:
-        table.add_column(col, style=style)
+    table = _TASKS_TABLE
+    _clear_rows(table)
+    table.title = title
     
     for task in tasks:
-        state_name, color = Task.STATE_MAP.get(task.state, ('Unknown', 'white'))
-        comment_preview = (task.comment[:20] + '...') if len(task.comment) > 20 else task.comment
+        state_text = Task.STATE_MAP.get(task.state, Task.UNKNOWN_STATE)[2]
         
         row = [
             str(task.id),
             task.title,
-            Text(state_name, style=color),
+            state_text,
             task.created_at,
             task.modified_at,
-            comment_preview
+            task.comment_preview
         ]
         table.add_row(*row)
     
@@ -189,8 +258,8 @@ def display_tasks(tab, filtered_tasks=None):
 
 def task_operations(tab):
     while True:
-        console.print("\n1. Show Tasks\n2. New Task\n3. Modify Task\n4. Delete Task\n5. View Task Info\n6. Filter Tasks\n7. Back to Tabs \n8. Exit Program")
-        choice = Prompt.ask("Choose action", choices=["1", "2", "3", "4", "5", "6", "7", "8"])
+        console.print(TASK_MENU)
+        choice = Prompt.ask("Choose action", choices=TASK_MENU_CHOICES)
         
         if choice == "1":
             display_tasks(tab)
@@ -238,17 +307,26 @@ def add_task(tab):
     )
     
     tab.tasks.append(new_task)
+    tab._by_id[new_task.id] = new_task
+    tab._by_state[new_task.state].add(new_task.id)
     tab.task_counter += 1
-    save_tabs([tab])
+    save_tab(tab)
     console.print("[green]Task added![/green]")
 
+# (attribute, change log template, how a value is shown in the log)
+TRACKED_FIELDS = (
+    ('title', "Title changed from '{}' to '{}'", str),
+    ('state', "State changed from '{}' to '{}'", lambda state: Task.STATE_MAP[state][0]),
+    ('comment', "Comment updated from '{}...' to '{}...'", lambda comment: comment[:20]),
+)
+
 def modify_task(tab):
     task_id = Prompt.ask("Enter task ID")
     task_id = validate_id(task_id)
     if task_id is None:
         return
     
-    task = next((t for t in tab.tasks if t.id == task_id), None)
+    task = tab._by_id.get(task_id)
     if not task:
         console.print("[red]Task not found![/red]")
         return
@@ -262,24 +340,25 @@ def modify_task(tab):
     new_comment = Prompt.ask("New comment", default=task.comment)
     
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    new_values = {'title': new_title, 'state': new_state, 'comment': new_comment}
     changes = []
-    if new_title != task.title:
-        changes.append(f"Title changed from '{task.title}' to '{new_title}'")
-    if new_state != task.state:
-        old_state = Task.STATE_MAP[task.state][0]
-        new_state_name = Task.STATE_MAP[new_state][0]
-        changes.append(f"State changed from '{old_state}' to '{new_state_name}'")
-    if new_comment != task.comment:
-        changes.append(f"Comment updated from '{task.comment[:20]}...' to '{new_comment[:20]}...'")
+    for attr, template, show in TRACKED_FIELDS:
+        old, new = getattr(task, attr), new_values[attr]
+        if old != new:
+            changes.append(template.format(show(old), show(new)))
     
     if changes:
+        if new_state != task.state:
+            tab._by_state[task.state].discard(task.id)
+            tab._by_state[new_state].add(task.id)
         task.title = new_title
         task.state = new_state
         task.comment = new_comment
+        task._comment_preview = None
         task.modified_at = now
         change_log = f"{now}: " + " | ".join(changes)
         task.history.append(change_log)
-        save_tabs([tab])
+        save_tab(tab)
         console.print("[green]Task updated![/green]")
     else:
         console.print("[yellow]No changes made.[/yellow]")
@@ -290,14 +369,16 @@ def delete_task(tab):
     if task_id is None:
         return
     
-    task = next((t for t in tab.tasks if t.id == task_id), None)
+    task = tab._by_id.get(task_id)
     if not task:
         console.print("[red]Task not found![/red]")
         return
     
     if Confirm.ask(f"[bold red]Are you sure you want to delete task '{task.title}'?[/bold red]"):
         tab.tasks.remove(task)
-        save_tabs([tab])
+        del tab._by_id[task_id]
+        tab._by_state[task.state].discard(task_id)
+        save_tab(tab)
         console.print("[bold red]Task deleted permanently![/bold red]")
         
         # Show updated task list
@@ -312,13 +393,13 @@ def view_task_info(tab):
     if task_id is None:
         return
     
-    task = next((t for t in tab.tasks if t.id == int(task_id)), None)
+    task = tab._by_id.get(task_id)
     if not task:
         console.print("[red]Task not found![/red]")
         return
     
     console.print(f"\n[bold underline]{task.title}[/bold underline]")
-    console.print(f"State: [{Task.STATE_MAP[task.state][1]}]{Task.STATE_MAP[task.state][0]}[/]")
+    console.print(f"State: {Task.STATE_MAP[task.state][3]}")
     console.print(f"Created: {task.created_at}")
     console.print(f"Last Modified: {task.modified_at}")
     console.print(f"\n[bold]Comment:[/bold] {task.comment}")
@@ -346,7 +427,7 @@ def filter_tasks(tab):
         f"Filter by state ({state_help})",
         choices=["u", "p", "g", "f"]
     )
-    filtered = [t for t in tab.tasks if t.state == state]
+    filtered = [tab._by_id[i] for i in sorted(tab._by_state[state])]
     
     if filtered:
         state_name = Task.STATE_MAP[state][0]
@@ -357,27 +438,20 @@ def filter_tasks(tab):
 
 def run_app():
     tabs = load_tabs()
+    # Tab choices only depend on how many tabs there are, rebuild when that changes
+    tab_choices = []
     
     while True:
         console.clear()
-        console.print(" WELCOME TO .... ")
-        console.print("""
-██████╗ ██╗   ██╗████████╗ █████╗ ███████╗██╗  ██╗███╗   ███╗ █████╗ ███╗   ██╗ █████╗  ██████╗ ███████╗██████╗ ██╗
-██╔══██╗╚██╗ ██╔╝╚══██╔══╝██╔══██╗██╔════╝██║ ██╔╝████╗ ████║██╔══██╗████╗  ██║██╔══██╗██╔════╝ ██╔════╝██╔══██╗██║
-██████╔╝ ╚████╔╝    ██║   ███████║███████╗█████╔╝ ██╔████╔██║███████║██╔██╗ ██║███████║██║  ███╗█████╗  ██████╔╝██║
-██╔═══╝   ╚██╔╝     ██║   ██╔══██║╚════██║██╔═██╗ ██║╚██╔╝██║██╔══██║██║╚██╗██║██╔══██║██║   ██║██╔══╝  ██╔══██╗╚═╝
-██║        ██║      ██║   ██║  ██║███████║██║  ██╗██║ ╚═╝ ██║██║  ██║██║ ╚████║██║  ██║╚██████╔╝███████╗██║  ██║██╗
-╚═╝        ╚═╝      ╚═╝   ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝     ╚═╝╚═╝  ╚═╝╚═╝  ╚═══╝╚═╝  ╚═╝ ╚═════╝ ╚══════╝╚═╝  ╚═╝╚═╝
-""")
-        console.print("Created by: [bold underline] Esteban Rivera [/bold underline]\n")
-        console.print("[bold underline]Task Manager 2.0[/bold underline]\n")
+        console.print(WELCOME_PANEL)
         display_tabs(tabs)
         
         if not tabs:
             choice = Prompt.ask("Select action", choices=["n", "e"], default="n")
         else:
-            choices = [str(i) for i in range(1, len(tabs)+1)] + ["m", "n", "e"]
-            choice = Prompt.ask("Select tab or action", choices=choices)
+            if len(tab_choices) != len(tabs) + 3:
+                tab_choices = [str(i) for i in range(1, len(tabs)+1)] + ["m", "n", "e"]
+            choice = Prompt.ask("Select tab or action", choices=tab_choices)
         
         if choice == "m":
             modify_tab(tabs)
@@ -392,7 +466,6 @@ def run_app():
                 selected_tab = tabs[tab_idx]
                 display_tasks(selected_tab)
                 task_operations(selected_tab)
-                save_tabs(tabs)
 
 # if __name__ == "__main__":
 #     main()
\ No newline at end of file
@@ -1,7 +1,8 @@
-import json
+import orjson
+import mmap
 import os
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import List, Callable
 
 from textual.app import App, ComposeResult
@@ -11,11 +12,13 @@ from textual.events import Key  # Removed ButtonPressed import
 
 # File names for persistence
 DATA_FILE = "tasks.json"
-ARCHIVE_FILE = "archived_tasks.json"
+ARCHIVE_FILE = "archived_tasks.jsonl"  # One task per line, only ever appended to
+LEGACY_ARCHIVE_FILE = "archived_tasks.json"
 LABELS_FILE = "labels.json"
+TASKS_LOG_FILE = "tasks.log"  # JSON lines of task changes since tasks.json was last written
 
 # Data model for a task
-@dataclass
+@dataclass(slots=True)
 class Task:
     id: int
     label: str
@@ -26,53 +29,102 @@ class Task:
     last_modified: str
     history: List[str]
 
-    def to_dict(self):
-        return asdict(self)
-
     @staticmethod
     def from_dict(data):
         return Task(**data)
 
 # Persistence functions for tasks and labels
+def _read_json(path: str):
+    # tasks.json is parsed from the mapped pages, without reading it into a bytes copy.
+    # app_deepseek.py has the same reader; these scripts run standalone, so keep both in step.
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return orjson.loads(f.read())
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
 def load_tasks() -> List[Task]:
+    tasks = []
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            data = json.load(f)
-            tasks = []
-            for item in data:
-                # Migrate legacy keys if needed
-                if "main_state" in item:
-                    item["state"] = item.pop("main_state")
-                if "sub_state" in item:
-                    del item["sub_state"]
-                tasks.append(Task.from_dict(item))
-            return tasks
-    return []
+        tasks = _read_json(DATA_FILE)
+        # One pass migrates legacy keys and swaps each dict for its Task in the parsed list
+        for i, item in enumerate(tasks):
+            # Migrate legacy keys if needed
+            if "main_state" in item:
+                item["state"] = item.pop("main_state")
+            if "sub_state" in item:
+                del item["sub_state"]
+            tasks[i] = Task.from_dict(item)
+    _replay_task_log(tasks)
+    return tasks
+
+def _replay_task_log(tasks: List[Task]):
+    if not os.path.exists(TASKS_LOG_FILE):
+        return
+    index = {task.id: i for i, task in enumerate(tasks)}
+    with open(TASKS_LOG_FILE, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # Torn last line from an interrupted write
+            task = Task.from_dict(orjson.loads(line)["task"])
+            if task.id in index:
+                tasks[index[task.id]] = task
+            else:
+                index[task.id] = len(tasks)
+                tasks.append(task)
+
+def append_task_log(tasks: List[Task]):
+    # Only the changed tasks are written; compact_tasks folds them into tasks.json
+    with open(TASKS_LOG_FILE, "ab") as f:
+        for task in tasks:
+            f.write(orjson.dumps({"op": "upd", "task": task}, option=orjson.OPT_SERIALIZE_DATACLASS) + b"\n")
+
+def compact_tasks(tasks: List[Task]):
+    save_tasks(tasks)
+    if os.path.exists(TASKS_LOG_FILE):
+        os.remove(TASKS_LOG_FILE)
+
+def _write_tasks(path: str, tasks: List[Task]):
+    # The slots dataclasses go to orjson as they are. compact_tasks only drops tasks.log
+    # after the rename, so a crash leaves the old snapshot plus its log, never half a file.
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(tasks, option=orjson.OPT_SERIALIZE_DATACLASS))
+    os.replace(tmp, path)
 
 def save_tasks(tasks: List[Task]):
-    with open(DATA_FILE, "w") as f:
-        json.dump([task.to_dict() for task in tasks], f, indent=4)
+    _write_tasks(DATA_FILE, tasks)
 
 def load_archived_tasks() -> List[Task]:
+    archived = []
+    # Tasks filed before the archive moved to JSON lines
+    if os.path.exists(LEGACY_ARCHIVE_FILE):
+        archived = _read_json(LEGACY_ARCHIVE_FILE)
+        for i, item in enumerate(archived):
+            archived[i] = Task.from_dict(item)
     if os.path.exists(ARCHIVE_FILE):
-        with open(ARCHIVE_FILE, "r") as f:
-            data = json.load(f)
-            return [Task.from_dict(item) for item in data]
-    return []
+        with open(ARCHIVE_FILE, "rb") as f:
+            for line in f:
+                if line.endswith(b"\n"):
+                    archived.append(Task.from_dict(orjson.loads(line)))
+    return archived
 
-def save_archived_tasks(tasks: List[Task]):
-    with open(ARCHIVE_FILE, "w") as f:
-        json.dump([task.to_dict() for task in tasks], f, indent=4)
+def append_archived_tasks(tasks: List[Task]):
+    with open(ARCHIVE_FILE, "ab") as f:
+        for task in tasks:
+            f.write(orjson.dumps(task, option=orjson.OPT_SERIALIZE_DATACLASS) + b"\n")
 
 def load_labels() -> List[str]:
     if os.path.exists(LABELS_FILE):
-        with open(LABELS_FILE, "r") as f:
-            return json.load(f)
+        with open(LABELS_FILE, "rb") as f:
+            return orjson.loads(f.read())
     return []
 
 def save_labels(labels: List[str]):
-    with open(LABELS_FILE, "w") as f:
-        json.dump(labels, f, indent=4)
+    with open(LABELS_FILE, "wb") as f:
+        f.write(orjson.dumps(labels, option=orjson.OPT_INDENT_2))
 
 # Define state colors
 state_colors = {
@@ -81,6 +133,8 @@ state_colors = {
     "in pause": "blue",
     "finished": "green",
 }
+# Rich markup for each known state, built once instead of on every refresh
+state_markup = {state: f"[{color}]{state}[/{color}]" for state, color in state_colors.items()}
 
 # A simple modal for text input
 class InputModal(Static):
@@ -90,7 +144,8 @@ class InputModal(Static):
         self.callback = callback
 
     def compose(self) -> ComposeResult:
-        yield Center(Label(self.prompt_text))
+        self.prompt_label = Label(self.prompt_text)
+        yield Center(self.prompt_label)
         self.input_field = Input(placeholder="Enter value here")
         yield Center(self.input_field)
         with Center():
@@ -98,13 +153,22 @@ class InputModal(Static):
                 yield Button("OK", id="ok")
                 yield Button("Cancel", id="cancel")
 
+    def reset(self, prompt: str, callback: Callable[[str], None]):
+        # Reuse an already composed modal for a new prompt
+        self.prompt_text = prompt
+        self.callback = callback
+        self.prompt_label.update(prompt)
+        self.input_field.value = ""
+
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "ok":
             value = self.input_field.value
-            self.callback(value)
-            self.remove()  # Remove the modal
+            callback = self.callback
+            # Release first so a chained prompt can reuse this same modal
+            self.app.release_input_modal(self)
+            callback(value)
         elif event.button.id == "cancel":
-            self.remove()
+            self.app.release_input_modal(self)
 
 # Main TUI application
 class TaskManagerApp(App):
@@ -113,16 +177,24 @@ class TaskManagerApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.tasks: List[Task] = load_tasks()
+        self._tasks_by_id = {task.id: task for task in self.tasks}
         self.color_coding = True
         self.selected_label = "All"
         # Load predefined labels (and add any missing ones from tasks)
         self.labels = load_labels()
+        loaded_count = len(self.labels)
+        known_labels = set(self.labels)
         for task in self.tasks:
-            if task.label not in self.labels:
+            if task.label not in known_labels:
+                known_labels.add(task.label)
                 self.labels.append(task.label)
-        save_labels(self.labels)
+        # Only rewrite the labels file when tasks brought in new labels
+        if len(self.labels) > loaded_count:
+            save_labels(self.labels)
+        self._invalidate_labels()
         self.next_id = max((task.id for task in self.tasks), default=0) + 1
         self.new_task_data = {}
+        self._modal_pool: List[InputModal] = []
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -147,10 +219,16 @@ class TaskManagerApp(App):
         self.refresh_labels()
         self.refresh_tasks_table()
 
+    def on_unmount(self) -> None:
+        compact_tasks(self.tasks)
+
+    def _invalidate_labels(self):
+        # Called whenever self.labels changes, so refreshes do not re-sort
+        self._sorted_labels = ["All"] + sorted(self.labels)
+
     def refresh_labels(self):
-        labels_list = ["All"] + sorted(self.labels)
         self.label_list.clear()
-        for label in labels_list:
+        for label in self._sorted_labels:
             self.label_list.append(ListItem(Label(label)))
 
     def refresh_tasks_table(self):
@@ -163,22 +241,29 @@ class TaskManagerApp(App):
 
         for task in tasks_to_show:
             color = state_colors.get(task.state, "white")
-            state_text = f"[{color}]{task.state}[/{color}]"
+            row_state = state_markup.get(task.state) or f"[{color}]{task.state}[/{color}]"
             if self.color_coding:
                 row_id = f"[{color}]{task.id}[/{color}]"
                 row_title = f"[{color}]{task.title}[/{color}]"
-                row_state = f"[{color}]{task.state}[/{color}]"
                 row_last_modified = f"[{color}]{task.last_modified}[/{color}]"
                 self.task_table.add_row(row_id, row_title, row_state, row_last_modified)
             else:
                 # Only color the state cell when color coding is off.
-                row_state = f"[{color}]{task.state}[/{color}]"
                 self.task_table.add_row(str(task.id), task.title, row_state, task.last_modified)
 
 
     def show_input_modal(self, prompt: str, callback: Callable[[str], None]):
-        modal = InputModal(prompt, callback)
-        self.mount(modal)
+        if self._modal_pool:
+            modal = self._modal_pool.pop()
+            modal.reset(prompt, callback)
+            modal.display = True
+        else:
+            self.mount(InputModal(prompt, callback))
+
+    def release_input_modal(self, modal: InputModal):
+        # Hide the modal and keep it around instead of removing it
+        modal.display = False
+        self._modal_pool.append(modal)
 
     async def action_toggle_color(self):
         self.color_coding = not self.color_coding
@@ -193,6 +278,7 @@ class TaskManagerApp(App):
         if label not in self.labels:
             self.labels.append(label)
             save_labels(self.labels)
+            self._invalidate_labels()
             self.refresh_labels()
         self.new_task_data["label"] = label
         self.show_input_modal("Enter task title:", self.add_task_title)
@@ -223,7 +309,8 @@ class TaskManagerApp(App):
         )
         self.next_id += 1
         self.tasks.append(new_task)
-        save_tasks(self.tasks)
+        self._tasks_by_id[new_task.id] = new_task
+        append_task_log([new_task])
         self.refresh_tasks_table()
 
     async def action_add_label(self):
@@ -233,6 +320,7 @@ class TaskManagerApp(App):
         if label and label not in self.labels:
             self.labels.append(label)
             save_labels(self.labels)
+            self._invalidate_labels()
             self.refresh_labels()
             self.log("Label added: " + label)
         else:
@@ -261,13 +349,18 @@ class TaskManagerApp(App):
         old_label = self.selected_label
         self.labels[index] = new_label
         save_labels(self.labels)
-        # Update tasks that have the old label
+        self._invalidate_labels()
+        # Update tasks that have the old label, all with the same timestamp
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        change_log = f"{now}: Label changed from '{old_label}' to '{new_label}'."
+        relabelled = []
         for task in self.tasks:
             if task.label == old_label:
                 task.label = new_label
-                task.last_modified = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                task.history.append(f"{task.last_modified}: Label changed from '{old_label}' to '{new_label}'.")
-        save_tasks(self.tasks)
+                task.last_modified = now
+                task.history.append(change_log)
+                relabelled.append(task)
+        append_task_log(relabelled)
         self.selected_label = new_label
         self.refresh_labels()
         self.refresh_tasks_table()
@@ -275,11 +368,11 @@ class TaskManagerApp(App):
     async def action_file_tasks(self):
         finished_tasks = [t for t in self.tasks if t.state == "finished"]
         if finished_tasks:
-            archived = load_archived_tasks()
-            archived.extend(finished_tasks)
-            save_archived_tasks(archived)
+            append_archived_tasks(finished_tasks)
             self.tasks = [t for t in self.tasks if t.state != "finished"]
-            save_tasks(self.tasks)
+            for task in finished_tasks:
+                del self._tasks_by_id[task.id]
+            compact_tasks(self.tasks)
             self.refresh_labels()
             self.refresh_tasks_table()
             await self.console.print("Finished tasks have been filed.")
@@ -307,7 +400,7 @@ class TaskManagerApp(App):
     async def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         row = self.task_table.get_row_at(event.row_key)
         task_id = int(row[0])
-        task = next((t for t in self.tasks if t.id == task_id), None)
+        task = self._tasks_by_id.get(task_id)
         if task:
             details = "\n" + "=" * 40 + "\n"
             details += f"Task ID: {task.id}\nTitle: {task.title}\nLabel: {task.label}\nState: {task.state}\nComment: {task.comment}\nHistory:\n"
@@ -1,9 +1,12 @@
-import json
+import asyncio
+import orjson
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from collections import defaultdict
+from dataclasses import dataclass, replace
 from typing import List, Callable, Optional
-from textwrap import shorten
 
 from textual.app import App, ComposeResult
 from textual.widgets import Header, Footer, DataTable, ListView, ListItem, Button, Static, Label, Input
@@ -14,6 +17,13 @@ from textual.events import Key
 DATA_FILE = "tasks.json"
 ARCHIVE_FILE = "archived_tasks.json"
 TABS_FILE = "tabs.json"
+HISTORY_FILE = "history.jsonl"
+MUTATIONS_FILE = "mutations.log"
+MUTATIONS_LIMIT = 100  # Pending field edits before tasks.json is rewritten
+
+def _now() -> str:
+    # Same "%Y-%m-%d %H:%M:%S" layout, without parsing a strftime pattern
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
 
 @dataclass
 class Task:
@@ -26,42 +36,156 @@ class Task:
     last_modified: str
     history: List[str]
 
-    def to_dict(self):
-        return asdict(self)
+    def __post_init__(self):
+        # Underscored attributes are not fields, so they are never persisted
+        self._comment_preview: Optional[str] = None
+
+    @property
+    def comment_preview(self) -> str:
+        if self._comment_preview is None:
+            comment = self.comment
+            self._comment_preview = comment[:17] + "..." if len(comment) > 20 else comment
+        return self._comment_preview
 
     @staticmethod
     def from_dict(data):
         return Task(**data)
 
+def _read_json(path: str):
+    # Serves tasks.json and the archive, parsed from the mapped pages without a bytes copy.
+    # other/app.py has the same reader; these scripts run standalone, so keep both in step.
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty files cannot be mapped
+            return orjson.loads(f.read())
+        with mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def _read_tasks(path: str) -> List[Task]:
+    data = _read_json(path)
+    # Reuse the parsed list, so the tasks are never held as both dicts and Tasks
+    for i, item in enumerate(data):
+        data[i] = Task.from_dict(item)
+    return data
+
 def load_tasks() -> List[Task]:
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return [Task.from_dict(item) for item in json.load(f)]
+        return _read_tasks(DATA_FILE)
     return []
 
+def _dump_tasks(tasks: List[Task]) -> bytes:
+    # orjson serializes the dataclasses directly, no intermediate dicts
+    return orjson.dumps(tasks, option=orjson.OPT_SERIALIZE_DATACLASS)
+
+def _write_file(path: str, data: bytes):
+    # tasks.json, the archive and history.jsonl are all replaced whole through here;
+    # as in other/app.py, the rename leaves the previous file rather than a truncated one
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def _write_tasks(path: str, tasks: List[Task]):
+    _write_file(path, _dump_tasks(tasks))
+
 def save_tasks(tasks: List[Task]):
-    with open(DATA_FILE, "w") as f:
-        json.dump([task.to_dict() for task in tasks], f, indent=4)
+    _write_tasks(DATA_FILE, tasks)
 
 def load_archived_tasks() -> List[Task]:
     if os.path.exists(ARCHIVE_FILE):
-        with open(ARCHIVE_FILE, "r") as f:
-            return [Task.from_dict(item) for item in json.load(f)]
+        return _read_tasks(ARCHIVE_FILE)
     return []
 
 def save_archived_tasks(tasks: List[Task]):
-    with open(ARCHIVE_FILE, "w") as f:
-        json.dump([task.to_dict() for task in tasks], f, indent=4)
+    _write_tasks(ARCHIVE_FILE, tasks)
+
+def archive_tasks(tasks: List[Task]):
+    archived = load_archived_tasks()
+    archived.extend(tasks)
+    save_archived_tasks(archived)
+
+def append_history(task_id: int, ts: str, field: str, old: str, new: str):
+    # One JSON line per edit, so an edit never rewrites earlier history
+    entry = {"id": task_id, "ts": ts, "field": field, "old": old, "new": new}
+    with open(HISTORY_FILE, "ab") as f:
+        f.write(orjson.dumps(entry) + b"\n")
+
+def _read_history() -> List[dict]:
+    if not os.path.exists(HISTORY_FILE):
+        return []
+    with open(HISTORY_FILE, "rb") as f:
+        # A line without its newline is a torn write from a crash
+        return [orjson.loads(line) for line in f if line.endswith(b"\n")]
+
+def _history_line(entry: dict) -> str:
+    return f"{entry['ts']}: Changed {entry['field']} from '{entry['old']}' to '{entry['new']}'"
+
+def load_history(task: Task) -> List[str]:
+    history = list(task.history)
+    history.extend(_history_line(entry) for entry in _read_history() if entry["id"] == task.id)
+    return history
+
+def with_history(tasks: List[Task]) -> List[Task]:
+    # Copies of the tasks with their logged edits folded in, for the archive
+    entries = defaultdict(list)
+    for entry in _read_history():
+        entries[entry["id"]].append(entry)
+    return [
+        replace(task, history=task.history + [_history_line(entry) for entry in entries.get(task.id, ())])
+        for task in tasks
+    ]
+
+def compact_history(tasks: List[Task]):
+    # Keep only the edits of live tasks; filed ones carry theirs in the archive
+    live_ids = {task.id for task in tasks}
+    kept = [orjson.dumps(entry) + b"\n" for entry in _read_history() if entry["id"] in live_ids]
+    _write_file(HISTORY_FILE, b"".join(kept))
+
+def append_mutation(mutation: dict):
+    with open(MUTATIONS_FILE, "ab") as f:
+        f.write(orjson.dumps(mutation) + b"\n")
+
+def replay_mutations(tasks_by_id: dict) -> int:
+    # Apply field edits logged since the last full save onto the loaded tasks
+    count = 0
+    if os.path.exists(MUTATIONS_FILE):
+        with open(MUTATIONS_FILE, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn last line from an interrupted write
+                mutation = orjson.loads(line)
+                task = tasks_by_id.get(mutation["id"])
+                if task is not None:
+                    setattr(task, mutation["field"], mutation["value"])
+                    task.last_modified = mutation["ts"]
+                count += 1
+    return count
+
+def clear_mutations():
+    if os.path.exists(MUTATIONS_FILE):
+        os.remove(MUTATIONS_FILE)
+
+def save_snapshot(data: bytes, filed: List[Task], live: Optional[List[Task]] = None):
+    # One job, so the log is only dropped once the snapshot covering it is on disk
+    if filed:
+        # Filed tasks reach the archive right before the snapshot that drops them
+        archive_tasks(with_history(filed))
+        filed.clear()  # Archived, a retry must not add them again
+    _write_file(DATA_FILE, data)
+    clear_mutations()
+    if live is not None:
+        compact_history(live)
 
 def load_tabs() -> List[str]:
     if os.path.exists(TABS_FILE):
-        with open(TABS_FILE, "r") as f:
-            return json.load(f)
+        with open(TABS_FILE, "rb") as f:
+            return orjson.loads(f.read())
     return []
 
 def save_tabs(tabs: List[str]):
-    with open(TABS_FILE, "w") as f:
-        json.dump(tabs, f, indent=4)
+    with open(TABS_FILE, "wb") as f:
+        f.write(orjson.dumps(tabs, option=orjson.OPT_INDENT_2))
 
 state_colors = {
     "urgent": "red",
@@ -69,6 +193,7 @@ state_colors = {
     "in pause": "blue",
     "finished": "green",
 }
+STATE_OPTIONS = list(state_colors.keys())
 
 class InputModal(Static):
     def __init__(self, prompt: str, callback: Callable[[str], None], initial_value: str = "", **kwargs):
@@ -148,23 +273,74 @@ class TaskManagerApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.tasks: List[Task] = load_tasks()
+        self._by_id = {}
         self.selected_tab = "All"
         self.selected_task_id: Optional[int] = None
         self.tabs = load_tabs()
-        self.next_id = max((task.id for task in self.tasks), default=0) + 1
         self.modify_task_data: Optional[Task] = None
-
+        # Mutations only flag the data as dirty; _flush writes it to disk.
+        # Disk I/O runs on a single background thread, so writes keep their order.
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._dirty_tasks = False
+        self._dirty_tabs = False
+        self._filed: List[Task] = []  # Finished tasks waiting for the next snapshot
+        self._trim_history = False  # Set when tasks leave, so their history.jsonl lines go too
+
+        # Single pass over the tasks: id index, highest id and missing tabs
+        max_id = 0
+        known_tabs = set(self.tabs)
         for task in self.tasks:
-            if task.tab not in self.tabs:
+            self._by_id[task.id] = task
+            if task.id > max_id:
+                max_id = task.id
+            if task.tab not in known_tabs:
+                known_tabs.add(task.tab)
                 self.tabs.append(task.tab)
-        save_tabs(self.tabs)
+        # History lines are matched by id alone, so never reuse an id that still has some
+        try:
+            for entry in _read_history():
+                if entry["id"] > max_id:
+                    max_id = entry["id"]
+        except (OSError, orjson.JSONDecodeError) as error:
+            self.log.error(f"Could not read {HISTORY_FILE}: {error!r}")
+        self.next_id = max_id + 1
+
+        # Single field edits go to the mutation log; the next full save compacts it
+        self._pending_mutations = replay_mutations(self._by_id)
+        if self._pending_mutations:
+            self._mark_dirty_tasks()
+
+        # Event dispatch tables, bound once instead of on every event
+        self._button_actions = {
+            "toggle_color": self.action_toggle_color,
+            "add_task": self.action_add_task,
+            "modify_task": self.action_modify_task,
+            "delete_task": self.action_delete_task,
+            "file_tasks": self.action_file_tasks,
+            "view_history": self.action_view_history,
+            "add_tab": self.action_add_tab,
+            "modify_tab": self.action_modify_tab,
+            "delete_tab": self.action_delete_tab,
+            "exit": self.action_exit
+        }
+        self._key_actions = {
+            "a": self.action_add_task,
+            "c": self.action_toggle_color,
+            "d": self.action_delete_task,
+            "f": self.action_file_tasks,
+            "h": self.action_view_history,
+            "m": self.action_modify_task,
+            "q": self.action_exit
+        }
+        self._mark_dirty_tabs()
+        self._invalidate_tabs()
 
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
         with Horizontal():
             with Vertical(classes="sidebar"):
                 yield Label("Tabs", classes="sidebar-title")
-                self.tab_list = ListView(*[ListItem(Label(tab)) for tab in ["All"] + sorted(self.tabs)])
+                self.tab_list = ListView()  # Filled by refresh_tabs on mount
                 yield self.tab_list
                 with Horizontal(classes="tab-buttons"):
                     yield Button("Add Tab", id="add_tab")
@@ -180,6 +356,7 @@ class TaskManagerApp(App):
                     yield Button("Add Task (a)", id="add_task")
                     yield Button("Modify Task (m)", id="modify_task")
                     yield Button("Delete Task (d)", id="delete_task")
+                    yield Button("History (h)", id="view_history")
                     yield Button("File Finished (f)", id="file_tasks")
                     yield Button("Exit (q)", id="exit")
         yield Footer()
@@ -187,13 +364,73 @@ class TaskManagerApp(App):
     def on_mount(self) -> None:
         self.refresh_tabs()
         self.refresh_tasks_table()
+        self.set_interval(0.5, self._flush)
+
+    async def on_unmount(self) -> None:
+        self._flush()
+        # Wait off the event loop so the last jobs can still report their failures
+        await asyncio.to_thread(self._writer.shutdown)
+
+    def _mark_dirty_tasks(self):
+        self._dirty_tasks = True
+
+    def _mark_removed_tasks(self):
+        self._trim_history = True
+        self._mark_dirty_tasks()
+
+    def _mark_dirty_tabs(self):
+        self._dirty_tabs = True
+
+    def _submit(self, on_error: Callable[[], None], fn: Callable, *args):
+        # Results come back on the event loop, never the writer thread. A failed write
+        # is logged and its data flagged dirty again, so the next flush retries it.
+        def done(future):
+            error = future.exception()
+            if error is not None:
+                self.log.error(f"{fn.__name__} failed: {error!r}")
+                on_error()
+        asyncio.wrap_future(self._writer.submit(fn, *args)).add_done_callback(done)
+
+    def _flush(self):
+        if self._dirty_tasks:
+            self._dirty_tasks = False
+            # Serialize here so the snapshot matches the tasks at this moment
+            filed, self._filed = self._filed, []
+            # Trimming history.jsonl only pays off when tasks have left it
+            live = list(self.tasks) if self._trim_history else None
+            self._trim_history = False
+            # The log is only cleared once the snapshot lands, so a failure keeps the count
+            pending, self._pending_mutations = self._pending_mutations, 0
+
+            def retry():
+                self._filed.extend(filed)  # Empty once they made it to the archive
+                self._trim_history = self._trim_history or live is not None
+                self._pending_mutations += pending
+                self._mark_dirty_tasks()
+
+            self._submit(retry, save_snapshot, _dump_tasks(self.tasks), filed, live)
+        if self._dirty_tabs:
+            self._dirty_tabs = False
+            self._submit(self._mark_dirty_tabs, save_tabs, list(self.tabs))
+
+    def _invalidate_tabs(self):
+        # Called whenever self.tabs changes; refresh_tabs rebuilds only then
+        self._sorted_tabs = ["All"] + sorted(self.tabs)
+        self._tab_items: List[ListItem] = []
 
     def refresh_tabs(self):
+        if self._tab_items:
+            # Same tabs as last time, only move the selection highlight
+            for tab, item in zip(self._sorted_tabs, self._tab_items):
+                item.set_class(tab == self.selected_tab, "selected")
+            return
+
         self.tab_list.clear()
-        for tab in ["All"] + sorted(self.tabs):
+        for tab in self._sorted_tabs:
             item = ListItem(Label(tab))
             if tab == self.selected_tab:
                 item.add_class("selected")
+            self._tab_items.append(item)
             self.tab_list.append(item)
 
     def refresh_tasks_table(self):
@@ -201,13 +438,12 @@ class TaskManagerApp(App):
         tasks_to_show = [t for t in self.tasks if self.selected_tab == "All" or t.tab == self.selected_tab]
         
         for task in tasks_to_show:
-            comment_preview = shorten(task.comment, width=20, placeholder="...")
             self.task_table.add_row(
                 str(task.id),
                 task.title,
                 task.created_at,
                 task.last_modified,
-                comment_preview
+                task.comment_preview
             )
 
     def show_input_modal(self, prompt: str, callback: Callable[[str], None], initial_value: str = ""):
@@ -237,7 +473,7 @@ class TaskManagerApp(App):
 
     def add_task_comment(self, comment: str):
         self.new_task_data["comment"] = comment
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = _now()
         new_task = Task(
             id=self.next_id,
             tab=self.new_task_data["tab"],
@@ -250,7 +486,8 @@ class TaskManagerApp(App):
         )
         self.next_id += 1
         self.tasks.append(new_task)
-        save_tasks(self.tasks)
+        self._by_id[new_task.id] = new_task
+        self._mark_dirty_tasks()
         self.refresh_tasks_table()
 
     async def action_delete_task(self):
@@ -258,15 +495,16 @@ class TaskManagerApp(App):
             self.console.print("Select a task first!")
             return
         
-        task = next((t for t in self.tasks if t.id == self.selected_task_id), None)
+        task = self._by_id.get(self.selected_task_id)
         if not task:
             self.console.print("Task not found!")
             return
 
         def delete_confirmed(confirmed: bool):
-            if confirmed:
-                self.tasks = [t for t in self.tasks if t.id != self.selected_task_id]
-                save_tasks(self.tasks)
+            # The task may be gone already, e.g. confirmed twice or filed meanwhile
+            if confirmed and self._by_id.pop(task.id, None) is not None:
+                self.tasks.remove(task)
+                self._mark_removed_tasks()
                 self.selected_task_id = None
                 self.refresh_tasks_table()
         
@@ -275,12 +513,40 @@ class TaskManagerApp(App):
             delete_confirmed
         )
 
+    async def action_view_history(self):
+        if not self.selected_task_id:
+            self.console.print("Select a task first!")
+            return
+
+        task = self._by_id.get(self.selected_task_id)
+        if not task:
+            self.console.print("Task not found!")
+            return
+
+        details = f"Tab: {task.tab}\nState: {task.state}\nComment: {task.comment}\n\n"
+        severity = "information"
+        try:
+            # Read through the writer so queued edits are included, without blocking the UI
+            history = await asyncio.wrap_future(self._writer.submit(load_history, task))
+        except (OSError, orjson.JSONDecodeError) as error:
+            # Like the write path, fall back to the history kept on the task
+            self.log.error(f"load_history failed: {error!r}")
+            history = task.history
+            severity = "error"
+            details = f"Could not read {HISTORY_FILE}, showing saved history only\n\n" + details
+        self.notify(
+            details + ("\n".join(history) or "No changes yet"),
+            title=f"Task {task.id}: {task.title}",
+            severity=severity,
+            timeout=10
+        )
+
     async def action_modify_task(self):
         if not self.selected_task_id:
             self.console.print("Select a task first!")
             return
         
-        task = next((t for t in self.tasks if t.id == self.selected_task_id), None)
+        task = self._by_id.get(self.selected_task_id)
         if not task:
             self.console.print("Task not found!")
             return
@@ -308,7 +574,7 @@ class TaskManagerApp(App):
         elif choice == "State":
             self.show_option_modal(
                 "Select new state:", 
-                list(state_colors.keys()), 
+                STATE_OPTIONS, 
                 lambda val: self.update_task_field("state", val)
             )
         elif choice == "Tab":
@@ -319,14 +585,30 @@ class TaskManagerApp(App):
             )
 
     def update_task_field(self, field: str, value: str):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        old_value = getattr(self.modify_task_data, field)
-        setattr(self.modify_task_data, field, value)
-        self.modify_task_data.last_modified = now
-        self.modify_task_data.history.append(
-            f"{now}: Changed {field} from '{old_value}' to '{value}'"
-        )
-        save_tasks(self.tasks)
+        now = _now()
+        task = self.modify_task_data
+        old_value = getattr(task, field)
+        setattr(task, field, value)
+        if field == "comment":
+            task._comment_preview = None
+        task.last_modified = now
+
+        def keep_history():
+            # history.jsonl is unwritable, so keep the entry on the task for the next snapshot
+            task.history.append(f"{now}: Changed {field} from '{old_value}' to '{value}'")
+            self._mark_dirty_tasks()
+
+        self._submit(keep_history, append_history, task.id, now, field, old_value, value)
+        self._submit(self._mark_dirty_tasks, append_mutation, {
+            "op": "update",
+            "id": task.id,
+            "field": field,
+            "value": value,
+            "ts": now
+        })
+        self._pending_mutations += 1
+        if self._pending_mutations >= MUTATIONS_LIMIT:
+            self._mark_dirty_tasks()
         self.refresh_tasks_table()
 
     async def action_add_tab(self):
@@ -335,7 +617,8 @@ class TaskManagerApp(App):
     def add_new_tab(self, tab: str):
         if tab and tab not in self.tabs:
             self.tabs.append(tab)
-            save_tabs(self.tabs)
+            self._mark_dirty_tabs()
+            self._invalidate_tabs()
             self.refresh_tabs()
 
     async def action_modify_tab(self):
@@ -350,11 +633,12 @@ class TaskManagerApp(App):
 
         old_tab = self.selected_tab
         self.tabs[self.tabs.index(old_tab)] = new_tab
-        save_tabs(self.tabs)
+        self._mark_dirty_tabs()
+        self._invalidate_tabs()
         for task in self.tasks:
             if task.tab == old_tab:
                 task.tab = new_tab
-        save_tasks(self.tasks)
+        self._mark_dirty_tasks()
         self.selected_tab = new_tab
         self.refresh_tabs()
         self.refresh_tasks_table()
@@ -367,9 +651,13 @@ class TaskManagerApp(App):
         def delete_confirmed(confirmed: bool):
             if confirmed:
                 self.tabs.remove(self.selected_tab)
-                self.tasks = [t for t in self.tasks if t.tab != self.selected_tab]
-                save_tabs(self.tabs)
-                save_tasks(self.tasks)
+                self._invalidate_tabs()
+                indices = [i for i, t in enumerate(self.tasks) if t.tab == self.selected_tab]
+                for i in reversed(indices):
+                    del self._by_id[self.tasks[i].id]
+                    del self.tasks[i]
+                self._mark_dirty_tabs()
+                self._mark_removed_tasks()
                 self.selected_tab = "All"
                 self.refresh_tabs()
                 self.refresh_tasks_table()
@@ -382,32 +670,23 @@ class TaskManagerApp(App):
     async def action_file_tasks(self):
         finished = [t for t in self.tasks if t.state == "finished"]
         if finished:
-            archived = load_archived_tasks()
-            archived.extend(finished)
-            save_archived_tasks(archived)
+            self._filed.extend(finished)
             self.tasks = [t for t in self.tasks if t.state != "finished"]
-            save_tasks(self.tasks)
+            for task in finished:
+                del self._by_id[task.id]
+            # Archive and snapshot now, in the same writer job
+            self._mark_removed_tasks()
+            self._flush()
             self.refresh_tasks_table()
 
     async def action_exit(self):
+        self._flush()
         self.exit()
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
-        button_id = event.button.id
-        actions = {
-            "toggle_color": self.action_toggle_color,
-            "add_task": self.action_add_task,
-            "modify_task": self.action_modify_task,
-            "delete_task": self.action_delete_task,
-            "file_tasks": self.action_file_tasks,
-            "add_tab": self.action_add_tab,
-            "modify_tab": self.action_modify_tab,
-            "delete_tab": self.action_delete_tab,
-            "exit": self.action_exit
-        }
-
-        if button_id in actions:
-            await actions[button_id]()
+        handler = self._button_actions.get(event.button.id)
+        if handler:
+            await handler()
 
     async def on_list_view_selected(self, event: ListView.Selected) -> None:
         self.selected_tab = str(event.item.query_one(Label).renderable)
@@ -437,16 +716,9 @@ class TaskManagerApp(App):
     #         """)
 
     async def on_key(self, event: Key) -> None:
-        keys = {
-            "a": self.action_add_task,
-            "c": self.action_toggle_color,
-            "d": self.action_delete_task,
-            "f": self.action_file_tasks,
-            "m": self.action_modify_task,
-            "q": self.action_exit
-        }
-        if event.key in keys:
-            await keys[event.key]()
+        handler = self._key_actions.get(event.key)
+        if handler:
+            await handler()
 
 if __name__ == "__main__":
     TaskManagerApp().run()
\ No newline at end of file
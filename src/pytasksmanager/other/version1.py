@@ -1,4 +1,4 @@
-import json
+import orjson
 import os
 import uuid
 from datetime import datetime
@@ -9,7 +9,19 @@ from rich.prompt import Prompt, Confirm
 DATA_FILE = 'tasks.json'
 console = Console()
 
+STATE_COLORS = {
+    "done": "green",
+    "in progress": "blue",
+    "in pause": "magenta",
+}
+
+def _now():
+    # Same "%Y-%m-%d %H:%M:%S" layout, without parsing a strftime pattern
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
 class Task:
+    __slots__ = ('id', 'title', 'main_state', 'sub_state', 'created_at', 'history', '_colored_state')
+
     def __init__(self, id, title, main_state, sub_state, created_at, history):
         self.id = id
         self.title = title
@@ -17,6 +29,17 @@ class Task:
         self.sub_state = sub_state
         self.created_at = created_at
         self.history = history  # List of history log strings
+        self._colored_state = None  # Cached markup, reset when the state changes
+
+    @property
+    def colored_state(self):
+        if self._colored_state is None:
+            if self.main_state == "not started":
+                color = "red" if self.sub_state.lower() == "urgent" else "yellow"
+            else:
+                color = STATE_COLORS.get(self.main_state, "white")
+            self._colored_state = f"[{color}]{self.main_state}[/{color}]"
+        return self._colored_state
 
     def to_dict(self):
         return {
@@ -41,14 +64,15 @@ class Task:
 
 def load_tasks():
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
+        with open(DATA_FILE, 'rb') as f:
+            data = orjson.loads(f.read())
             return [Task.from_dict(item) for item in data]
     return []
 
 def save_tasks(tasks):
-    with open(DATA_FILE, 'w') as f:
-        json.dump([task.to_dict() for task in tasks], f, indent=4)
+    # Compact output; orjson calls to_dict per task, so no intermediate list of dicts
+    with open(DATA_FILE, 'wb') as f:
+        f.write(orjson.dumps(tasks, default=Task.to_dict))
 
 def display_tasks(tasks, filter_main_state=None):
     table = Table(title="Task List")
@@ -62,24 +86,10 @@ def display_tasks(tasks, filter_main_state=None):
         if filter_main_state and task.main_state != filter_main_state:
             continue
 
-        # Define colors based on task state
-        color = "white"
-        if task.main_state == "done":
-            color = "green"
-        elif task.main_state == "not started":
-            if task.sub_state.lower() == "urgent":
-                color = "red"
-            else:
-                color = "yellow"
-        elif task.main_state == "in progress":
-            color = "blue"
-        elif task.main_state == "in pause":
-            color = "magenta"
-
         table.add_row(
             task.id,
             task.title,
-            f"[{color}]{task.main_state}[/{color}]",
+            task.colored_state,
             task.sub_state,
             task.created_at
         )
@@ -91,7 +101,7 @@ def add_task(tasks):
     sub_state = Prompt.ask("Enter sub state (e.g., Urgent, To the future, Need info to continue)", default="None")
     
     task_id = str(uuid.uuid4())[:8]  # Generate a short unique id
-    created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    created_at = _now()
     history = [f"{created_at}: Task created with state '{main_state}' and sub-state '{sub_state}'."]
     
     new_task = Task(task_id, title, main_state, sub_state, created_at, history)
@@ -111,10 +121,11 @@ def change_task(tasks):
     new_main_state = Prompt.ask("Enter new main state", choices=["not started", "in progress", "in pause", "done"], default=task.main_state)
     new_sub_state = Prompt.ask("Enter new sub state", default=task.sub_state)
     if Confirm.ask("Are you sure you want to apply these changes?"):
-        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        now = _now()
         change_entry = f"{now}: Changed main state from '{task.main_state}' to '{new_main_state}', sub state from '{task.sub_state}' to '{new_sub_state}'."
         task.main_state = new_main_state
         task.sub_state = new_sub_state
+        task._colored_state = None
         task.history.append(change_entry)
         save_tasks(tasks)
         console.print("[green]Task updated successfully![/green]")